@@ -1,12 +1,23 @@
+import ctypes
+import functools
 import os
 import platform
 import shutil
+import stat
+import struct
 import subprocess
 import sys
+from ctypes import wintypes
 from pathlib import Path
+from typing import NamedTuple
 import threading
 import contextlib
 import argparse
+import csv
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 try:
 	import tkinter as tk
@@ -19,27 +30,170 @@ except Exception:
 def is_admin() -> bool:
 
 	try:
-		import ctypes  # noqa: WPS433 - windows admin check
 		return bool(ctypes.windll.shell32.IsUserAnAdmin())
 	except Exception:
 		return False
 
 
-def detect_lmstudio_processes() -> list[str]:
+def _is_lmstudio_name(text: str) -> bool:
+
+	folded = text.casefold()
+	return "lmstudio" in folded or "lm studio" in folded
+
+
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+TH32CS_SNAPPROCESS = 0x00000002
+DELETE = 0x00010000
+GENERIC_WRITE = 0x40000000
+FILE_SHARE_READ = 0x00000001
+FILE_SHARE_WRITE = 0x00000002
+FILE_SHARE_DELETE = 0x00000004
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_FLAG_OPEN_REPARSE_POINT = 0x00200000
+FILE_DISPOSITION_INFO_EX_CLASS = 21
+FILE_DISPOSITION_FLAG_DELETE = 0x00000001
+FILE_DISPOSITION_FLAG_POSIX_SEMANTICS = 0x00000002
+FILE_DISPOSITION_FLAG_IGNORE_READONLY_ATTRIBUTE = 0x00000010
+FSCTL_SET_REPARSE_POINT = 0x000900A4
+IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003
+FILE_SUPPORTS_BLOCK_REFCOUNTING = 0x08000000
+FSCTL_DUPLICATE_EXTENTS_TO_FILE = 0x00098344
+# 单次块克隆请求须小于 4 GiB，这里按 1 GiB 分段
+CLONE_CHUNK_SIZE = 1 << 30
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+	_fields_ = [
+		("dwSize", wintypes.DWORD),
+		("cntUsage", wintypes.DWORD),
+		("th32ProcessID", wintypes.DWORD),
+		("th32DefaultHeapID", ctypes.c_size_t),
+		("th32ModuleID", wintypes.DWORD),
+		("cntThreads", wintypes.DWORD),
+		("th32ParentProcessID", wintypes.DWORD),
+		("pcPriClassBase", wintypes.LONG),
+		("dwFlags", wintypes.DWORD),
+		("szExeFile", wintypes.WCHAR * 260),
+	]
+
+
+class DUPLICATE_EXTENTS_DATA(ctypes.Structure):
+	_fields_ = [
+		("FileHandle", wintypes.HANDLE),
+		("SourceFileOffset", ctypes.c_longlong),
+		("TargetFileOffset", ctypes.c_longlong),
+		("ByteCount", ctypes.c_longlong),
+	]
+
+
+@functools.lru_cache(maxsize=None)
+def _kernel32():
+
+	# 仅在 Windows 上可用；首次调用时声明函数原型，之后复用
+	kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+	kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+	kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+	kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+	kernel32.Process32FirstW.restype = wintypes.BOOL
+	kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+	kernel32.Process32NextW.restype = wintypes.BOOL
+	kernel32.CreateFileW.argtypes = [
+		wintypes.LPCWSTR,
+		wintypes.DWORD,
+		wintypes.DWORD,
+		wintypes.LPVOID,
+		wintypes.DWORD,
+		wintypes.DWORD,
+		wintypes.HANDLE,
+	]
+	kernel32.CreateFileW.restype = wintypes.HANDLE
+	kernel32.SetFileInformationByHandle.argtypes = [wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD]
+	kernel32.SetFileInformationByHandle.restype = wintypes.BOOL
+	kernel32.DeviceIoControl.argtypes = [
+		wintypes.HANDLE,
+		wintypes.DWORD,
+		wintypes.LPVOID,
+		wintypes.DWORD,
+		wintypes.LPVOID,
+		wintypes.DWORD,
+		ctypes.POINTER(wintypes.DWORD),
+		wintypes.LPVOID,
+	]
+	kernel32.DeviceIoControl.restype = wintypes.BOOL
+	kernel32.GetVolumeInformationW.argtypes = [
+		wintypes.LPCWSTR,
+		wintypes.LPWSTR,
+		wintypes.DWORD,
+		ctypes.POINTER(wintypes.DWORD),
+		ctypes.POINTER(wintypes.DWORD),
+		ctypes.POINTER(wintypes.DWORD),
+		wintypes.LPWSTR,
+		wintypes.DWORD,
+	]
+	kernel32.GetVolumeInformationW.restype = wintypes.BOOL
+	kernel32.GetDiskFreeSpaceW.argtypes = [
+		wintypes.LPCWSTR,
+		ctypes.POINTER(wintypes.DWORD),
+		ctypes.POINTER(wintypes.DWORD),
+		ctypes.POINTER(wintypes.DWORD),
+		ctypes.POINTER(wintypes.DWORD),
+	]
+	kernel32.GetDiskFreeSpaceW.restype = wintypes.BOOL
+	kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+	kernel32.CloseHandle.restype = wintypes.BOOL
+	return kernel32
+
+
+def _enum_processes() -> list[tuple[int, str]]:
+
+	# 通过 Toolhelp32 快照直接枚举进程，免去启动 tasklist 与解析文本输出
+	kernel32 = _kernel32()
+	snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+	if snapshot is None or snapshot == INVALID_HANDLE_VALUE:
+		raise ctypes.WinError(ctypes.get_last_error())
+	try:
+		processes: list[tuple[int, str]] = []
+		entry = PROCESSENTRY32W()
+		entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+		ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+		while ok:
+			processes.append((entry.th32ProcessID, entry.szExeFile))
+			ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+		return processes
+	finally:
+		kernel32.CloseHandle(snapshot)
+
+
+def _detect_lmstudio_processes_tasklist() -> list[str]:
 
 	try:
-		completed = subprocess.run(["tasklist"], capture_output=True, text=True, shell=True)
-		output = completed.stdout or ""
+		completed = subprocess.run(
+			["tasklist", "/FO", "CSV", "/NH"],
+			capture_output=True,
+			text=True,
+			shell=False,
+			creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+		)
 		matches: list[str] = []
-		for line in output.splitlines():
-			lower = line.lower()
-			if "lmstudio" in lower or "lm studio" in lower:
-				matches.append(line)
+		# CSV 每行: "映像名称","PID","会话名","会话#","内存使用"
+		for row in csv.reader((completed.stdout or "").splitlines()):
+			if len(row) >= 2 and _is_lmstudio_name(row[0]):
+				matches.append(f"{row[0]} (PID {row[1]})")
 		return matches
 	except Exception:
 		return []
 
 
+def detect_lmstudio_processes() -> list[str]:
+
+	try:
+		processes = _enum_processes()
+	except Exception:
+		return _detect_lmstudio_processes_tasklist()
+	return [f"{name} (PID {pid})" for pid, name in processes if _is_lmstudio_name(name)]
+
+
 def format_bytes(num_bytes: int) -> str:
 
 	units = ["B", "KB", "MB", "GB", "TB"]
@@ -51,24 +205,123 @@ def format_bytes(num_bytes: int) -> str:
 	return f"{amount:.2f} PB"
 
 
-def walk_dir_size(directory: Path) -> int:
+class TreeEntry(NamedTuple):
+	relpath: str
+	size: int
+	is_dir: bool  # 对链接而言表示其是否指向目录
+	is_link: bool
+
+
+def _is_junction_stat(st: os.stat_result) -> bool:
+
+	return getattr(st, "st_reparse_tag", 0) == getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", None)
+
 
-	total_size = 0
-	for root, dirs, files in os.walk(directory, topdown=True):
+def _is_link_entry(entry: os.DirEntry) -> bool:
+
+	# 符号链接与 Windows 目录联接都只删除链接本身，绝不进入其指向的目录
+	if entry.is_symlink():
+		return True
+	return os.name == "nt" and _is_junction_stat(entry.stat(follow_symlinks=False))
+
+
+def _scan_tree_fwalk(path: Path) -> list[TreeEntry]:
+
+	# POSIX: fwalk 基于目录 fd 做 fstatat，避免每个文件都从根重新解析路径
+	entries: list[TreeEntry] = []
+	for root, dirs, files, rootfd in os.fwalk(path):
+		rel_root = os.path.relpath(root, path)
+		prefix = "" if rel_root == "." else rel_root
+		for dir_name in dirs:
+			try:
+				st = os.stat(dir_name, dir_fd=rootfd, follow_symlinks=False)
+			except OSError:
+				continue
+			entries.append(TreeEntry(os.path.join(prefix, dir_name), 0, True, stat.S_ISLNK(st.st_mode)))
 		for file_name in files:
-			file_path = Path(root) / file_name
 			try:
-				total_size += file_path.stat().st_size
+				st = os.stat(file_name, dir_fd=rootfd, follow_symlinks=False)
+			except OSError:
+				continue
+			is_link = stat.S_ISLNK(st.st_mode)
+			entries.append(TreeEntry(os.path.join(prefix, file_name), 0 if is_link else st.st_size, False, is_link))
+	return entries
+
+
+def _scan_tree_scandir(path: Path) -> list[TreeEntry]:
+
+	# 显式栈的 scandir 先序遍历；Windows 上 DirEntry.stat() 直接复用目录枚举数据
+	entries: list[TreeEntry] = []
+	try:
+		stack = [(os.scandir(path), "")]
+	except OSError:
+		return entries
+	try:
+		while stack:
+			it, prefix = stack[-1]
+			entry = next(it, None)
+			if entry is None:
+				stack.pop()[0].close()
+				continue
+			relpath = os.path.join(prefix, entry.name)
+			try:
+				if _is_link_entry(entry):
+					entries.append(TreeEntry(relpath, 0, entry.is_dir(), True))
+				elif entry.is_dir(follow_symlinks=False):
+					entries.append(TreeEntry(relpath, 0, True, False))
+					stack.append((os.scandir(entry.path), relpath))
+				else:
+					entries.append(TreeEntry(relpath, entry.stat(follow_symlinks=False).st_size, False, False))
 			except OSError:
 				pass
-	return total_size
+	finally:
+		for it, _ in stack:
+			it.close()
+	return entries
+
 
+def scan_tree(path: Path) -> list[TreeEntry]:
 
-def collect_dir_info(path: Path) -> dict:
+	# 一次遍历得到先序文件清单(目录总在其内容之前)；每次调用都会重新遍历，需要复用时由调用方保存清单
+	if hasattr(os, "fwalk"):
+		return _scan_tree_fwalk(path)
+	return _scan_tree_scandir(path)
+
+
+def quick_dir_info(path: Path) -> dict:
+
+	# 仅判断存在性与是否为空，只读取第一个目录项，不做完整遍历
+	try:
+		st = path.stat()
+	except OSError:
+		st = None
 
 	info = {
-		"exists": path.exists(),
-		"is_dir": path.is_dir(),
+		"exists": st is not None,
+		"is_dir": st is not None and stat.S_ISDIR(st.st_mode),
+		"is_empty": True,
+	}
+
+	if info["exists"] and info["is_dir"]:
+		try:
+			with os.scandir(path) as it:
+				info["is_empty"] = next(it, None) is None
+		except OSError:
+			pass
+
+	return info
+
+
+def full_dir_info(path: Path) -> dict:
+
+	try:
+		st = path.stat()
+	except OSError:
+		st = None
+
+	info = {
+		"exists": st is not None,
+		"is_dir": st is not None and stat.S_ISDIR(st.st_mode),
 		"file_count": 0,
 		"dir_count": 0,
 		"total_size": 0,
@@ -76,15 +329,15 @@ def collect_dir_info(path: Path) -> dict:
 	}
 
 	if info["exists"] and info["is_dir"]:
-		file_count = 0
-		dir_count = 0
-		for _, dirs, files in os.walk(path, topdown=True):
-			dir_count += len(dirs)
-			file_count += len(files)
+		entries = scan_tree(path)
+		# 与 os.walk 一致: 指向目录的符号链接/联接也计为子目录
+		dir_count = sum(1 for entry in entries if entry.is_dir)
+		file_count = len(entries) - dir_count
+		total_size = sum(entry.size for entry in entries)
 		info["file_count"] = file_count
 		info["dir_count"] = dir_count
 		info["is_empty"] = (file_count == 0 and dir_count == 0)
-		info["total_size"] = walk_dir_size(path)
+		info["total_size"] = total_size
 
 	return info
 
@@ -134,8 +387,25 @@ def ensure_directory(path: Path) -> None:
 	path.mkdir(parents=True, exist_ok=True)
 
 
-def run_robocopy(source: Path, target: Path) -> bool:
+def _stream_command(cmd: list[str]) -> int:
+
+	# 逐行转发输出而非整体捕获，避免长时间复制时内存增长并提供实时进度
+	with subprocess.Popen(
+		cmd,
+		stdout=subprocess.PIPE,
+		stderr=subprocess.STDOUT,
+		text=True,
+		errors="replace",
+		shell=False,
+	) as proc:
+		for line in proc.stdout:
+			print(line, end="")
+		return proc.wait()
 
+
+def run_robocopy(source: Path, target: Path, threads: int = 16) -> bool:
+
+	# /MT 多线程复制, /J 对大文件使用无缓冲 I/O, /NFL /NDL /NP 减少逐文件日志输出
 	cmd = [
 		"robocopy",
 		str(source),
@@ -144,47 +414,400 @@ def run_robocopy(source: Path, target: Path) -> bool:
 		"/COPYALL",
 		"/R:1",
 		"/W:1",
+		f"/MT:{threads}",
+		"/J",
+		"/NFL",
+		"/NDL",
+		"/NP",
 	]
 	print("\n正在复制(robocopy)...")
 	print("命令:", " ".join(cmd))
 	try:
-		completed = subprocess.run(cmd, capture_output=True, text=True, shell=False)
-		print(completed.stdout)
-		if completed.returncode <= 7:
+		returncode = _stream_command(cmd)
+		if returncode <= 7:
 			print("复制成功。")
 			return True
-		print("复制失败，返回码:", completed.returncode)
-		print(completed.stderr)
+		print("复制失败，返回码:", returncode)
 		return False
 	except FileNotFoundError:
 		print("未找到 robocopy，将使用 Python 复制。")
 		return False
 
 
-def copy_directory(source: Path, target: Path) -> None:
+def run_robocopy_metadata(source: Path, target: Path) -> bool:
 
-	ensure_directory(target)
-	used_robocopy = run_robocopy(source, target)
-	if used_robocopy:
+	# 只补齐元数据: /IS /IT 让已存在的同名文件也参与处理，/COPY 不含 D 则不复制数据
+	# 复制安全描述符(S)、所有者(O)、审核信息(U)、属性(A)与时间戳(T)，/XJ 不进入目录联接
+	cmd = [
+		"robocopy",
+		str(source),
+		str(target),
+		"/E",
+		"/IS",
+		"/IT",
+		"/COPY:ATSOU",
+		"/DCOPY:DAT",
+		"/XJ",
+		"/R:1",
+		"/W:1",
+		"/NFL",
+		"/NDL",
+		"/NP",
+	]
+	print("\n正在复制文件属性与权限(robocopy)...")
+	print("命令:", " ".join(cmd))
+	try:
+		returncode = _stream_command(cmd)
+	except FileNotFoundError:
+		print("未找到 robocopy。")
+		return False
+	if returncode <= 7:
+		return True
+	print("复制属性与权限失败，返回码:", returncode)
+	return False
+
+
+COPY_BUFSIZE = 1024 * 1024
+
+
+def _copy_readinto(fsrc, fdst, buffer: bytearray) -> None:
+
+	# 复用同一块缓冲区 readinto，避免每读一块都分配新的 bytes 对象
+	# 文件以无缓冲方式打开，write 可能只写入部分数据，需要循环写完
+	with memoryview(buffer) as buf:
+		while True:
+			read = fsrc.readinto(buf)
+			if not read:
+				break
+			view = buf[:read]
+			while view:
+				view = view[fdst.write(view):]
+
+
+def make_buffer_pool(count: int) -> queue.Queue[bytearray]:
+
+	# 预先分配固定数量的复制缓冲区，供线程池中的各个复制任务轮流借用
+	buffers: queue.Queue[bytearray] = queue.Queue()
+	for _ in range(count):
+		buffers.put(bytearray(COPY_BUFSIZE))
+	return buffers
+
+
+def _volume_root(path: str | Path) -> str:
+
+	return os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+
+
+def supports_block_clone(path: Path) -> bool:
+
+	# Windows: ReFS 等卷通过 FILE_SUPPORTS_BLOCK_REFCOUNTING 声明支持块克隆
+	# POSIX 上 copy_file_range 已会在 btrfs/xfs 等 CoW 文件系统上自动触发 reflink，无需特殊处理
+	if os.name != "nt":
+		return False
+	flags = wintypes.DWORD(0)
+	try:
+		ok = _kernel32().GetVolumeInformationW(_volume_root(path), None, 0, None, None, ctypes.byref(flags), None, 0)
+	except Exception:
+		return False
+	return bool(ok) and bool(flags.value & FILE_SUPPORTS_BLOCK_REFCOUNTING)
+
+
+@functools.lru_cache(maxsize=None)
+def _cluster_size(root: str) -> int:
+
+	sectors_per_cluster = wintypes.DWORD(0)
+	bytes_per_sector = wintypes.DWORD(0)
+	free_clusters = wintypes.DWORD(0)
+	total_clusters = wintypes.DWORD(0)
+	if not _kernel32().GetDiskFreeSpaceW(
+		root,
+		ctypes.byref(sectors_per_cluster),
+		ctypes.byref(bytes_per_sector),
+		ctypes.byref(free_clusters),
+		ctypes.byref(total_clusters),
+	):
+		raise ctypes.WinError(ctypes.get_last_error())
+	return sectors_per_cluster.value * bytes_per_sector.value
+
+
+def _clone_file(src_fd: int, dst_fd: int, to_path: str) -> None:
+
+	# FSCTL_DUPLICATE_EXTENTS_TO_FILE: 目标文件直接共享源文件的数据块，只写元数据
+	# 克隆区域须按簇对齐，最后一段向上取整到簇大小(可越过文件末尾)
+	import msvcrt  # noqa: WPS433 - windows file handles
+
+	size = os.fstat(src_fd).st_size
+	if size == 0:
 		return
-	print("\n正在复制(Python shutil)... 这可能较慢。")
-	for root, dirs, files in os.walk(source):
-		rel_root = os.path.relpath(root, source)
-		dest_root = target / rel_root if rel_root != "." else target
-		ensure_directory(dest_root)
-		for file_name in files:
-			from_path = Path(root) / file_name
-			to_path = dest_root / file_name
-			if not to_path.exists():
-				shutil.copy2(from_path, to_path)
+	cluster = _cluster_size(_volume_root(to_path))
+	os.ftruncate(dst_fd, size)
+	kernel32 = _kernel32()
+	dst_handle = msvcrt.get_osfhandle(dst_fd)
+	data = DUPLICATE_EXTENTS_DATA()
+	data.FileHandle = msvcrt.get_osfhandle(src_fd)
+	returned = wintypes.DWORD(0)
+	offset = 0
+	while offset < size:
+		count = min(CLONE_CHUNK_SIZE, size - offset)
+		count = -(-count // cluster) * cluster
+		data.SourceFileOffset = offset
+		data.TargetFileOffset = offset
+		data.ByteCount = count
+		if not kernel32.DeviceIoControl(
+			dst_handle,
+			FSCTL_DUPLICATE_EXTENTS_TO_FILE,
+			ctypes.byref(data),
+			ctypes.sizeof(data),
+			None,
+			0,
+			ctypes.byref(returned),
+			None,
+		):
+			raise ctypes.WinError(ctypes.get_last_error())
+		offset += count
+
+
+def _fast_copyfile(
+	from_path: str,
+	to_path: str,
+	buffers: queue.Queue[bytearray] | None = None,
+	clone: bool = False,
+) -> None:
+
+	# 依次尝试 copy_file_range(可触发 CoW 克隆) -> sendfile(内核态拷贝) -> 用户态 readinto 循环
+	# 每一级都从当前文件偏移继续，失败时不会重复或遗漏数据
+	with open(from_path, "rb", buffering=0) as fsrc, open(to_path, "wb", buffering=0) as fdst:
+		src_fd = fsrc.fileno()
+		dst_fd = fdst.fileno()
+		if clone:
+			try:
+				_clone_file(src_fd, dst_fd, to_path)
+				return
+			except OSError:
+				# 块克隆失败(如稀疏/完整性属性不一致)时清空目标，改为普通复制
+				fdst.truncate(0)
+		remaining = os.fstat(src_fd).st_size
+		if remaining and hasattr(os, "copy_file_range"):
+			try:
+				while remaining > 0:
+					sent = os.copy_file_range(src_fd, dst_fd, remaining)
+					if sent == 0:
+						break
+					remaining -= sent
+			except OSError:
+				pass
+		if remaining > 0 and hasattr(os, "sendfile"):
+			try:
+				while remaining > 0:
+					sent = os.sendfile(dst_fd, src_fd, None, remaining)
+					if sent == 0:
+						break
+					remaining -= sent
+			except OSError:
+				pass
+		if buffers is None:
+			_copy_readinto(fsrc, fdst, bytearray(min(remaining, COPY_BUFSIZE) or 8192))
+			return
+		buffer = buffers.get()
+		try:
+			_copy_readinto(fsrc, fdst, buffer)
+		finally:
+			buffers.put(buffer)
+
+
+def copy_file(
+	from_path: str,
+	to_path: str,
+	buffers: queue.Queue[bytearray] | None = None,
+	clone: bool = False,
+) -> None:
+
+	try:
+		_fast_copyfile(from_path, to_path, buffers, clone)
+	except FileNotFoundError:
+		# 扫描之后源文件已被删除(如 LM Studio 退出时清理的锁文件)，跳过即可
+		if not os.path.lexists(from_path):
+			return
+		raise
+	shutil.copystat(from_path, to_path)
+
+
+# 小文件按批提交到线程池，摊薄每个任务的调度与唤醒开销；每批最多这么多个文件
+SMALL_FILE_BATCH = 64
+
+
+def copy_files(
+	pairs: list[tuple[str, str]],
+	buffers: queue.Queue[bytearray] | None = None,
+	clone: bool = False,
+) -> None:
+
+	for from_path, to_path in pairs:
+		copy_file(from_path, to_path, buffers, clone)
 
 
-def delete_directory(path: Path) -> None:
+def default_workers() -> int:
+
+	return min(32, (os.cpu_count() or 1) * 4)
+
+
+def copy_directory(
+	source: Path,
+	target: Path,
+	workers: int | None = None,
+) -> list[TreeEntry]:
+
+	# 目标原本不存在时(常见情况)其中不可能已有文件，复制时无需逐个检查
+	target_existed = os.path.lexists(target)
+	ensure_directory(target)
+	# 确认之后、复制之前只扫描一次；返回的清单交给删除步骤，之后才出现在源中的文件不会被删除
+	entries = scan_tree(source)
+	# 同一支持块克隆的卷(ReFS)上直接克隆数据块，只写元数据，无需经过 robocopy 真正搬运数据
+	clone = os.stat(source).st_dev == os.stat(target).st_dev and supports_block_clone(target)
+	if clone:
+		print("\n源目录与目标目录位于同一支持块克隆的卷，使用块克隆复制。")
+	else:
+		used_robocopy = run_robocopy(source, target, min(workers, 128) if workers else 16)
+		if used_robocopy:
+			return entries
+		print("\n正在复制(Python shutil)... 这可能较慢。")
+	source_root = os.fspath(source)
+	target_root = os.fspath(target)
+	# 按先序清单串行创建目录与链接，文件内容提交到线程池并行复制
+	# 文件 I/O 会释放 GIL，多线程可并行处理大量小文件与网络目标
+	max_workers = workers or default_workers()
+	# 没有 sendfile 的平台(Windows)只能走用户态复制，由各线程共享一组预分配的缓冲区
+	buffers = None if hasattr(os, "sendfile") else make_buffer_pool(max_workers)
+	# 批大小按小文件总数与线程数计算，保证每个线程至少分到约 4 个任务，不牺牲并行度
+	small_count = sum(1 for entry in entries if not entry.is_dir and not entry.is_link and entry.size < COPY_BUFSIZE)
+	batch_size = max(1, min(SMALL_FILE_BATCH, -(-small_count // (max_workers * 4))))
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		futures = []
+		batch: list[tuple[str, str]] = []
+		for entry in entries:
+			from_path = os.path.join(source_root, entry.relpath)
+			to_path = os.path.join(target_root, entry.relpath)
+			if entry.is_dir and not entry.is_link:
+				os.makedirs(to_path, exist_ok=True)
+			elif target_existed and os.path.lexists(to_path):
+				continue
+			elif entry.is_link and os.name == "nt" and _is_junction_stat(os.lstat(from_path)):
+				# 目录联接按联接重建，不能降级为需要额外特权的符号链接
+				_make_junction(to_path, os.readlink(from_path))
+			elif entry.is_link:
+				os.symlink(os.readlink(from_path), to_path, target_is_directory=entry.is_dir)
+			elif entry.size >= COPY_BUFSIZE:
+				futures.append(executor.submit(copy_file, from_path, to_path, buffers, clone))
+			else:
+				batch.append((from_path, to_path))
+				if len(batch) >= batch_size:
+					futures.append(executor.submit(copy_files, batch, buffers, clone))
+					batch = []
+		if batch:
+			futures.append(executor.submit(copy_files, batch, buffers, clone))
+		for future in futures:
+			future.result()
+	# 目录时间戳要在其中的文件全部写入之后再复制
+	for entry in entries:
+		if entry.is_dir and not entry.is_link:
+			with contextlib.suppress(FileNotFoundError):
+				shutil.copystat(os.path.join(source_root, entry.relpath), os.path.join(target_root, entry.relpath))
+	shutil.copystat(source_root, target_root)
+	# 块克隆只搬运数据，copystat 仅有时间戳与只读位；ACL、所有者及隐藏/系统属性由 robocopy 补齐(同 /COPYALL)
+	if clone and not run_robocopy_metadata(source, target):
+		print("警告: 未能复制 ACL、所有者与文件属性，目标仅保留了时间戳与只读属性。")
+	return entries
+
+
+def _win_delete_file(path: str) -> None:
+
+	# 以 POSIX 语义标记删除: 句柄关闭即从目录移除，且忽略只读属性
+	kernel32 = _kernel32()
+	handle = kernel32.CreateFileW(
+		path,
+		DELETE,
+		FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+		None,
+		OPEN_EXISTING,
+		FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_OPEN_REPARSE_POINT,
+		None,
+	)
+	if handle is None or handle == INVALID_HANDLE_VALUE:
+		raise ctypes.WinError(ctypes.get_last_error())
+	try:
+		flags = wintypes.DWORD(
+			FILE_DISPOSITION_FLAG_DELETE
+			| FILE_DISPOSITION_FLAG_POSIX_SEMANTICS
+			| FILE_DISPOSITION_FLAG_IGNORE_READONLY_ATTRIBUTE
+		)
+		if not kernel32.SetFileInformationByHandle(
+			handle, FILE_DISPOSITION_INFO_EX_CLASS, ctypes.byref(flags), ctypes.sizeof(flags)
+		):
+			raise ctypes.WinError(ctypes.get_last_error())
+	finally:
+		kernel32.CloseHandle(handle)
+
+
+def _remove_file(path: str) -> None:
+
+	if os.name == "nt":
+		try:
+			_win_delete_file(path)
+			return
+		except OSError:
+			pass
+	with contextlib.suppress(FileNotFoundError):
+		os.unlink(path)
+
+
+def _fast_rmtree(path: Path, workers: int | None = None, entries: list[TreeEntry] | None = None) -> None:
+
+	root_st = os.lstat(path)
+	if stat.S_ISLNK(root_st.st_mode) or _is_junction_stat(root_st):
+		raise OSError(f"不能删除链接本身指向的目录树: {path}")
+
+	# 按先序清单并行删除文件与链接，再逆序删除目录；未给出清单时现场扫描
+	# 给出复制时的清单时只删除已复制的条目，源中多出的文件会让 rmdir 失败并中止流程
+	if entries is None:
+		entries = scan_tree(path)
+	root = os.fspath(path)
+	files = [os.path.join(root, entry.relpath) for entry in entries if entry.is_link or not entry.is_dir]
+	dirs = [root] + [os.path.join(root, entry.relpath) for entry in entries if entry.is_dir and not entry.is_link]
+
+	# unlink 会释放 GIL，多线程可并行删除大量小文件
+	with ThreadPoolExecutor(max_workers=workers or default_workers()) as executor:
+		for _ in executor.map(_remove_file, files):
+			pass
+	for dir_path in reversed(dirs):
+		with contextlib.suppress(FileNotFoundError):
+			os.rmdir(dir_path)
+
+
+def delete_directory(path: Path, entries: list[TreeEntry] | None = None) -> None:
 
 	if not path.exists():
 		return
 	print(f"\n正在删除源目录: {path}")
-	shutil.rmtree(path, ignore_errors=False)
+	_fast_rmtree(path, entries=entries)
+
+
+def _mount_point_reparse_buffer(target: str) -> bytes:
+
+	# REPARSE_DATA_BUFFER(MountPointReparseBuffer): 替代名为 \??\<目标>，显示名为 <目标>
+	substitute = ("\\??\\" + target).encode("utf-16-le")
+	print_name = target.encode("utf-16-le")
+	path_buffer = substitute + b"\0\0" + print_name + b"\0\0"
+	header = struct.pack(
+		"<IHHHHHH",
+		IO_REPARSE_TAG_MOUNT_POINT,
+		8 + len(path_buffer),
+		0,
+		0,
+		len(substitute),
+		len(substitute) + 2,
+		len(print_name),
+	)
+	return header + path_buffer
 
 
 def create_junction(link_path: Path, target_path: Path) -> None:
@@ -192,22 +815,57 @@ def create_junction(link_path: Path, target_path: Path) -> None:
 	if link_path.exists() or link_path.is_symlink():
 		raise RuntimeError(f"链接位置已存在: {link_path}")
 	print(f"\n正在创建目录联接(Junction): {link_path} -> {target_path}")
-	cmd = ["cmd", "/c", "mklink", "/J", str(link_path), str(target_path)]
-	completed = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-	if completed.returncode != 0:
-		stderr = (completed.stderr or "").strip()
-		stdout = (completed.stdout or "").strip()
-		raise RuntimeError(f"创建联接失败。\nSTDOUT: {stdout}\nSTDERR: {stderr}")
+	try:
+		_make_junction(link_path, target_path)
+	except OSError as exc:
+		raise RuntimeError(f"创建联接失败: {exc}") from exc
 	print("联接创建成功。")
 
 
+def _make_junction(link_path: str | Path, target_path: str | Path) -> None:
+
+	# 直接写入挂载点重解析数据(等同 mklink /J)，无需启动 cmd.exe，失败时抛出带 GetLastError 的 OSError
+	target = os.fspath(target_path)
+	for prefix in ("\\\\?\\", "\\??\\"):
+		if target.startswith(prefix):
+			target = target[len(prefix):]
+	target = os.path.abspath(target)
+	buffer = _mount_point_reparse_buffer(target)
+	kernel32 = _kernel32()
+	os.mkdir(link_path)
+	try:
+		handle = kernel32.CreateFileW(
+			str(link_path),
+			GENERIC_WRITE,
+			0,
+			None,
+			OPEN_EXISTING,
+			FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_OPEN_REPARSE_POINT,
+			None,
+		)
+		if handle is None or handle == INVALID_HANDLE_VALUE:
+			raise ctypes.WinError(ctypes.get_last_error())
+		try:
+			returned = wintypes.DWORD(0)
+			if not kernel32.DeviceIoControl(
+				handle, FSCTL_SET_REPARSE_POINT, buffer, len(buffer), None, 0, ctypes.byref(returned), None
+			):
+				raise ctypes.WinError(ctypes.get_last_error())
+		finally:
+			kernel32.CloseHandle(handle)
+	except OSError:
+		with contextlib.suppress(OSError):
+			os.rmdir(link_path)
+		raise
+
+
 def ensure_windows() -> None:
 
 	if platform.system().lower() != "windows":
 		raise SystemExit("此工具仅支持 Windows。")
 
 
-def run_cli() -> None:
+def run_cli(workers: int | None = None) -> None:
 
 	ensure_windows()
 	print("LM Studio 目录迁移与联接工具")
@@ -218,13 +876,13 @@ def run_cli() -> None:
 
 	# 选择源目录
 	source_dir = prompt_for_path("请输入源目录", default_source)
-	source_info = collect_dir_info(source_dir)
+	source_info = full_dir_info(source_dir)
 	print_dir_info("源目录信息", source_dir, source_info)
 
 	if not source_info["exists"]:
 		if ask_yes_no("源目录不存在，是否创建并继续?", default="y"):
 			ensure_directory(source_dir)
-			source_info = collect_dir_info(source_dir)
+			source_info = full_dir_info(source_dir)
 			print_dir_info("源目录信息(已创建)", source_dir, source_info)
 		else:
 			print("已取消。")
@@ -238,7 +896,7 @@ def run_cli() -> None:
 	# 选择目标目录
 	while True:
 		target_dir = prompt_for_path("请输入目标目录", default_target)
-		target_info = collect_dir_info(target_dir)
+		target_info = full_dir_info(target_dir)
 		print_dir_info("目标目录信息", target_dir, target_info)
 
 		if target_info["exists"]:
@@ -254,7 +912,7 @@ def run_cli() -> None:
 				if not ask_yes_no("确认删除现有目标并覆盖? 此操作不可恢复!", default="n"):
 					continue
 				print(f"\n正在删除现有目标: {target_dir}")
-				shutil.rmtree(target_dir, ignore_errors=False)
+				_fast_rmtree(target_dir)
 				break
 			elif choice == "3":
 				if not ask_yes_no("确认跳过复制，仅联接到现有目标?", default="n"):
@@ -291,14 +949,14 @@ def run_cli() -> None:
 
 	# 执行复制
 	try:
-		copy_directory(source_dir, target_dir)
+		copied = copy_directory(source_dir, target_dir, workers)
 	except Exception as exc:
 		print(f"复制过程中发生错误: {exc}")
 		return
 
 	# 删除源目录
 	try:
-		delete_directory(source_dir)
+		delete_directory(source_dir, copied)
 	except Exception as exc:
 		print(f"删除源目录失败: {exc}")
 		print("为避免数据损坏，未创建联接。请手动检查后重试。")
@@ -335,9 +993,16 @@ class GuiWriter:
 		pass
 
 
+def _redirect_output_to_queue(log_queue) -> None:
+
+	# 复制子进程的初始化函数: 将 print 输出经进程间队列送回 GUI 进程
+	sys.stdout = GuiWriter(log_queue.put)
+	sys.stderr = GuiWriter(log_queue.put)
+
+
 class MoveApp(tk.Tk):
 
-	def __init__(self) -> None:
+	def __init__(self, workers: int | None = None) -> None:
 		super().__init__()
 		self.title("LM Studio 迁移与联接工具")
 		self.geometry("780x560")
@@ -347,8 +1012,19 @@ class MoveApp(tk.Tk):
 		self.overwrite_var = tk.BooleanVar(value=False)
 		self.link_only_var = tk.BooleanVar(value=False)
 
+		self.workers = workers
+		self._log_queue: queue.Queue[str] = queue.Queue()
+		self._process_log_queue = multiprocessing.Queue()
+
+		# 复制阶段的进程池；仅在此阶段允许关闭窗口中止迁移，由锁保证与删除阶段的切换不会交错
+		self._copy_executor: ProcessPoolExecutor | None = None
+		self._close_lock = threading.Lock()
+		self._closing = False
+
 		self._build_ui()
 		self._running = False
+		self.protocol("WM_DELETE_WINDOW", self._on_close)
+		self.after(50, self._drain_log)
 
 	def _build_ui(self) -> None:
 
@@ -406,10 +1082,22 @@ class MoveApp(tk.Tk):
 
 	def _append_log(self, text: str) -> None:
 
-		def _do_insert() -> None:
-			self.txt_log.insert(tk.END, text)
+		# 可在任意线程调用；实际写入由 _drain_log 在主线程批量完成
+		self._log_queue.put(text)
+
+	def _drain_log(self) -> None:
+
+		# 每 50ms 合并一批日志，一次 insert + see，避免高频输出时淹没 Tk 事件循环
+		# 先取复制子进程的输出: 其中的内容总是早于工作线程在复制结束后写入的日志
+		batch: list[str] = []
+		for log_queue in (self._process_log_queue, self._log_queue):
+			with contextlib.suppress(queue.Empty):
+				while len(batch) < 1000:
+					batch.append(log_queue.get_nowait())
+		if batch:
+			self.txt_log.insert(tk.END, "".join(batch))
 			self.txt_log.see(tk.END)
-		self.after(0, _do_insert)
+		self.after(50, self._drain_log)
 
 	def _clear_log(self) -> None:
 
@@ -443,8 +1131,8 @@ class MoveApp(tk.Tk):
 
 		source = Path(self.source_var.get()).expanduser().resolve()
 		target = Path(self.target_var.get()).expanduser().resolve()
-		si = collect_dir_info(source)
-		ti = collect_dir_info(target)
+		si = full_dir_info(source)
+		ti = full_dir_info(target)
 		self._append_log(self._format_info("源目录信息", source, si))
 		self._append_log(self._format_info("目标目录信息", target, ti))
 
@@ -458,6 +1146,33 @@ class MoveApp(tk.Tk):
 			except Exception:
 				w.configure(state=("disabled" if running else "normal"))
 
+	def _on_close(self) -> None:
+
+		if self._running:
+			if self._copy_executor is None:
+				messagebox.showwarning("正在运行", "正在删除目录或创建联接，中途退出会留下不完整的目录。请等待完成后再关闭。")
+				return
+			if not messagebox.askyesno("正在运行", "正在复制。关闭窗口将中止复制，源目录保持不变，目标目录中可能留下不完整的副本。是否中止并退出？"):
+				return
+			with self._close_lock:
+				executor = self._copy_executor
+				self._closing = executor is not None
+			if executor is None:
+				messagebox.showwarning("正在运行", "复制已完成，正在删除源目录或创建联接。请等待完成后再关闭。")
+				return
+			# 连同 robocopy 一起结束复制子进程；工作线程随即收到 BrokenProcessPool，不会再删除源目录
+			for process in list((executor._processes or {}).values()):
+				if os.name == "nt":
+					subprocess.run(
+						["taskkill", "/T", "/F", "/PID", str(process.pid)],
+						capture_output=True,
+						creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+					)
+				else:
+					process.terminate()
+			executor.shutdown(wait=False, cancel_futures=True)
+		self.destroy()
+
 	def _start(self) -> None:
 
 		ensure_windows()
@@ -473,8 +1188,8 @@ class MoveApp(tk.Tk):
 			messagebox.showerror("错误", "请填写目标目录")
 			return
 
-		si = collect_dir_info(source)
-		ti = collect_dir_info(target)
+		si = quick_dir_info(source)
+		ti = quick_dir_info(target)
 
 		# 源目录存在性与空目录确认
 		if not si["exists"]:
@@ -486,7 +1201,7 @@ class MoveApp(tk.Tk):
 				messagebox.showerror("错误", f"创建源目录失败: {exc}")
 				return
 			# 刷新信息
-			si = collect_dir_info(source)
+			si = quick_dir_info(source)
 
 		if si["is_dir"] and si["is_empty"]:
 			if not messagebox.askyesno("确认", "源目录为空，是否继续？"):
@@ -534,24 +1249,44 @@ class MoveApp(tk.Tk):
 					# 覆盖时先删除目标
 					if overwrite and target.exists():
 						print(f"\n正在删除现有目标: {target}")
-						shutil.rmtree(target, ignore_errors=False)
-
-					copy_directory(source, target)
-					delete_directory(source)
+						_fast_rmtree(target)
+
+					# 复制放到独立进程执行，避免与 Tk 主线程争用 GIL，界面与日志保持流畅
+					try:
+						with ProcessPoolExecutor(
+							max_workers=1,
+							initializer=_redirect_output_to_queue,
+							initargs=(self._process_log_queue,),
+						) as executor:
+							future = executor.submit(copy_directory, source, target, self.workers)
+							with self._close_lock:
+								self._copy_executor = executor
+							copied = future.result()
+					except BrokenProcessPool:
+						if self._closing:
+							return
+						raise
+					finally:
+						with self._close_lock:
+							self._copy_executor = None
+					if self._closing:
+						return
+					delete_directory(source, copied)
 					create_junction(source, target)
 					print("\n操作完成！\n")
 			finally:
-				self._set_running(False)
+				if not self._closing:
+					self._set_running(False)
 
 		threading.Thread(target=worker, daemon=True).start()
 
 
-def run_gui() -> None:
+def run_gui(workers: int | None = None) -> None:
 
 	ensure_windows()
 	if tk is None:
 		raise SystemExit("未检测到 Tkinter，无法启动图形界面。")
-	app = MoveApp()
+	app = MoveApp(workers)
 	app.source_var.set(str((Path.home() / ".lmstudio").resolve()))
 	app.target_var.set(str(Path("D:/LMstudio_AIModels").resolve()))
 	app.mainloop()
@@ -559,15 +1294,20 @@ def run_gui() -> None:
 
 if __name__ == "__main__":
 
+	# 打包为 exe 时，复制子进程需要由此进入
+	multiprocessing.freeze_support()
 	try:
 		parser = argparse.ArgumentParser(description="LM Studio 目录迁移与联接工具")
 		parser.add_argument("--cli", action="store_true", help="使用命令行模式")
 		parser.add_argument("--gui", action="store_true", help="使用图形界面模式")
+		parser.add_argument("--workers", type=int, default=None, help="并行线程数: 作为 robocopy /MT 参数(默认 16)，以及 Python 复制的线程数(默认: CPU 核数×4，最多 32)")
 		args = parser.parse_args()
+		if args.workers is not None and args.workers < 1:
+			parser.error("--workers 必须为正整数")
 		if args.cli:
-			run_cli()
+			run_cli(args.workers)
 		else:
-			run_gui()
+			run_gui(args.workers)
 	except KeyboardInterrupt:
 		print("\n已取消。")
 